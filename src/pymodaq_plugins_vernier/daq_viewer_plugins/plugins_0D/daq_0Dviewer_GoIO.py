@@ -1,14 +1,26 @@
+import functools
+
 import numpy as np
 from pymodaq.utils.daq_utils import ThreadCommand
 from pymodaq.utils.data import DataFromPlugins, DataToExport
 from pymodaq.control_modules.viewer_utility_classes import DAQ_Viewer_base, comon_parameters, main
 from pymodaq.utils.parameter import Parameter
 
-from pymodaq_plugins_vernier.hardware.goio.goio_wrapper import Sensor, GoIOWrapper64
+from pymodaq_plugins_vernier.hardware.goio.goio_wrapper import (
+    Sensor, get_goio, GoIOError)
+
 
-with GoIOWrapper64() as goio:
-    version = goio.get_version()
-    devices = goio.get_devices('GoLink')
+@functools.lru_cache(maxsize=1)
+def _discover_devices() -> list:
+    """ Enumerate connected GoLink devices, spawning the 32-bit bridge only on demand
+
+    Cached so the costly subprocess/DLL startup is paid at most once, and returning
+    a placeholder when no hardware (or no bridge) is available
+    """
+    try:
+        return get_goio().get_devices('GoLink') or ['<none>']
+    except Exception:
+        return ['<none>']
 
 
 class DAQ_0DViewer_GoIO(DAQ_Viewer_base):
@@ -25,13 +37,15 @@ class DAQ_0DViewer_GoIO(DAQ_Viewer_base):
          
     """
     params = comon_parameters+[
-        {'title': 'Device', 'name': 'device', 'type': 'list', 'value': devices[0],
-         'limits': devices}
+        {'title': 'Device', 'name': 'device', 'type': 'list', 'value': '', 'limits': []}
         ]
 
     def ini_attributes(self):
         self.controller: Sensor = None
         self._running = True
+        devices = _discover_devices()
+        self.settings.child('device').setLimits(devices)
+        self.settings.child('device').setValue(devices[0])
 
     def commit_settings(self, param: Parameter):
         """Apply the consequences of a change of value in the detector settings
@@ -66,7 +80,10 @@ class DAQ_0DViewer_GoIO(DAQ_Viewer_base):
         if self.settings['controller_status'] == 'Master':
             self.controller.init_library()
 
-        sensor_info = self.controller.open(self.settings['device'], 'GoLink')
+        try:
+            sensor_info = self.controller.open(self.settings['device'], 'GoLink')
+        except GoIOError as e:
+            return str(e), False
 
         info = str(sensor_info)
         initialized = True
@@ -90,13 +107,17 @@ class DAQ_0DViewer_GoIO(DAQ_Viewer_base):
             self.controller.start()
             self._running = True
 
-        data_array = np.array([self.controller.get_last_measurement()])
-
-        self.dte_signal.emit(
-            DataToExport(name='myplugin',
-                         data=[
-                             DataFromPlugins(name='GoLink', data=[data_array],
-                                             dim='Data0D', labels=[''])]))
+        data = self.controller.get_last_measurements(Naverage)
+        #  data is None when no sensor is open and empty when no sample is ready yet
+        value = float(data.mean()) if data is not None and data.size else 0.
+
+        #  a fresh array and DataToExport per frame: the signal crosses to the
+        #  viewer thread and consumers (software averaging, saving) keep references
+        #  across grabs, so the emitted buffer must never be rewritten in place
+        self.dte_signal.emit(DataToExport(
+            name='myplugin',
+            data=[DataFromPlugins(name='GoLink', data=[np.array([value])],
+                                  dim='Data0D', labels=[''])]))
 
     def stop(self):
         self._running = False
@@ -1,18 +1,70 @@
+import atexit
+import pickle
 import time
+from functools import partial
+from pathlib import Path
 from typing import Union, Optional, List
 
+import numpy as np
+
 from pymodaq_plugins_vernier.hardware.goio.goio_wrapper_client64 import (
-    GoIOWrapper64, ProductID, SensorInfo)
+    GoIOWrapper64, ProductID, SensorInfo, CalibrationEquation, GoIOError)
+
+#  probe type and calibration of an already-seen device are remembered on disk so
+#  reconnecting does not have to query them again across the 32-bit bridge; the
+#  cache is validated against the sensor id of the attached probe at open, so
+#  swapping probes on the same Go!Link invalidates it automatically
+_CACHE_DIR = Path.home().joinpath('.cache', 'pymodaq_plugins_vernier')
+
+
+def _device_cache_path(device: str) -> Path:
+    safe = ''.join(char if char.isalnum() else '_' for char in device)
+    return _CACHE_DIR.joinpath(f'{safe}.pkl')
+
+
+def _load_device_cache(device: str) -> Optional[dict]:
+    try:
+        with open(_device_cache_path(device), 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_device_cache(device: str, info: dict):
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_device_cache_path(device), 'wb') as f:
+            pickle.dump(info, f)
+    except Exception:
+        pass
+
+_GOIO_SINGLETON: Optional[GoIOWrapper64] = None
+
+
+def get_goio() -> GoIOWrapper64:
+    """ Get the process-wide GoIOWrapper64 instance, opened and ready
+
+    Spawning the 32-bit server and initializing the DLL is expensive, so the
+    same bridge is shared between device enumeration and the sensor controllers
+    and is only torn down at interpreter exit
+    """
+    global _GOIO_SINGLETON
+    if _GOIO_SINGLETON is None:
+        _GOIO_SINGLETON = GoIOWrapper64()
+        _GOIO_SINGLETON.open_library()
+        atexit.register(_GOIO_SINGLETON.close_library)
+    return _GOIO_SINGLETON
 
 
 class Sensor:
     def __init__(self, goiowrapper: GoIOWrapper64 = None):
         self._goio: GoIOWrapper64 = goiowrapper
         self._handle: int = None
+        self._calibration: Optional[tuple] = None
+        self._probe_type = None
 
     def init_library(self):
-        self._goio = GoIOWrapper64()
-        self._goio.open_library()
+        self._goio = get_goio()
 
     @property
     def goio(self):
@@ -21,14 +73,85 @@ class Sensor:
     def get_devices(self, product: Union[str, ProductID]) -> List[str]:
         return self._goio.get_devices(product)
 
+    _BOUND_METHODS = ('clear', 'start', 'stop', 'get_last_measurements',
+                      'get_all_measurements')
+
     def open(self, device: str, product: Union[str, ProductID]) -> SensorInfo:
         sensor_info: SensorInfo = self._goio.open_sensor(device, product)
+        if not sensor_info.handle:
+            #  a failed GoIO_Sensor_Open returns a NULL handle (e.g. no hardware or
+            #  the '<none>' placeholder device): fail here rather than passing NULL
+            #  to the DLL or binding the guard-free hot-path methods
+            raise GoIOError(f'Could not open a sensor on device {device!r}')
         self._handle = sensor_info.handle
+        self._bind_handle_methods()
+        #  calibration and probe type belong to the attached probe, not the
+        #  Go!Link interface: one cheap sensor-number query validates the cache,
+        #  and legacy probes (id 0) are not discriminable so always requeried
+        sensor_number = self._goio.get_sensor_number(self._handle)
+        cached = _load_device_cache(sensor_info.name)
+        if (cached is not None and sensor_number
+                and cached.get('sensor_number') == sensor_number):
+            self._calibration = cached['calibration']
+            self._probe_type = cached['probe_type']
+        else:
+            try:
+                self._calibration = self._goio.get_calibration(self._handle)
+            except Exception:  # no DDS memory on this sensor, keep raw readings
+                self._calibration = None
+            self._probe_type = self._goio.get_probe_type(self._handle)
+            _save_device_cache(sensor_info.name,
+                               dict(sensor_number=sensor_number,
+                                    calibration=self._calibration,
+                                    probe_type=self._probe_type))
         return sensor_info
 
+    def get_probe_type(self):
+        return self._probe_type
+
+    def raw_to_calibrated(self, raw):
+        """ Convert raw measurements to calibrated values with the cached calibration
+
+        The DDS coefficients apply to volts, so raw counts are first mapped to
+        volts with the cached affine mapping, then through the calibration
+        equation. Linear and quadratic equations are computed locally, element-wise
+        on scalars or numpy arrays; other equation types (e.g. Steinhart-Hart
+        temperature probes) are converted through the 32-bit bridge. Returns the
+        input unchanged if the sensor exposes no calibration
+        """
+        if self._calibration is None:
+            return raw
+        equation, a, b, c, slope, offset = self._calibration
+        if slope is not None and equation in (
+                CalibrationEquation.kEquationType_Linear,
+                CalibrationEquation.kEquationType_Quadratic):
+            volts = offset + slope * raw
+            if equation is CalibrationEquation.kEquationType_Linear:
+                return a + b * volts
+            return a + b * volts + c * volts * volts
+        if np.ndim(raw) == 0:
+            return self._goio.raw_to_calibrated(self._handle, int(raw))
+        return self._goio.raw_to_calibrated_array(self._handle, raw)
+
+    def _bind_handle_methods(self):
+        """ Specialize the acquisition methods for the open handle
+
+        Once a sensor is open the handle cannot be None anymore, so the per-call
+        guard is replaced by instance-bound partials on the hot paths; the guarded
+        class methods remain as the fallback while no sensor is open
+        """
+        self.clear = partial(self._goio.clear_sensor, self._handle)
+        self.start = partial(self._goio.start, self._handle)
+        self.stop = partial(self._goio.stop, self._handle)
+        self.get_last_measurements = partial(self._goio.read_latest_batch, self._handle)
+        self.get_all_measurements = partial(self._goio.read_raw, self._handle)
+
     def close(self):
         if self._handle is not None:
             self._goio.close_sensor(self._handle)
+            self._handle = None
+            for name in self._BOUND_METHODS:
+                self.__dict__.pop(name, None)
 
     def clear(self):
         if self._handle is not None:
@@ -43,8 +166,18 @@ class Sensor:
             self._goio.stop(self._handle)
 
     def get_last_measurement(self):
+        data = self.get_last_measurements()
+        if data is not None and data.size:
+            return data[-1]
+
+    def get_last_measurements(self, n: int = 1):
+        """ Get up to n of the newest measurements in a single round-trip
+
+        The measurement FIFO is drained on every call, so the returned samples
+        are always current even when the sensor outpaces the caller
+        """
         if self._handle is not None:
-            return self._goio.read_raw_latest(self._handle)
+            return self._goio.read_latest_batch(self._handle, n)
 
     def get_all_measurements(self):
         if self._handle is not None:
@@ -4,7 +4,6 @@ import sys
 import ctypes
 from ctypes import c_int, c_uint8, byref
 from pathlib import Path
-import time
 from typing import Union, Optional, List
 import numpy as np
 from packaging.version import Version, parse
@@ -13,16 +12,21 @@ from msl.loadlib import Client64
 from pymodaq_plugins_vernier.hardware.goio.goio_wrapper_server32 import (
     VendorID, ProductID, SensorInfo, SensorCommand, SensorStatus,
     SensorErrorStatus, GoIOError, LEDColor, LEDBrightness,
-    LEDParam, ProbeType, DefaultResponse, enum_checker)
+    LEDParam, ProbeType, CalibrationEquation, DefaultResponse, enum_checker)
 
 here = Path(__file__).parent
 
+#  capacity of the shared-memory block used for bulk reads; the sample count
+#  matches the server scratch buffer (a multiple of 6, see the note there)
+SHM_BYTES = 4098 * 4
+
 
 class GoIOWrapper64(Client64):
 
     def __init__(self):
         super().__init__(module32=str(here.joinpath('goio_wrapper_server32.py')),
                          append_sys_path=str(here))
+        self._shm = None
 
     def __enter__(self):
         self.open_library()
@@ -32,11 +36,38 @@ class GoIOWrapper64(Client64):
         self.close_library()
 
     def open_library(self):
-        return self.request32('open_library')
+        res = self.request32('open_library')
+        self._attach_shm()
+        return res
 
     def close_library(self):
+        self._detach_shm()
         return self.request32('close_library')
 
+    def _attach_shm(self):
+        """ Share a memory block with the 32-bit server for bulk measurement reads
+
+        Falls back silently to the pickled RPC transport if shared memory cannot
+        be set up on either side
+        """
+        try:
+            from multiprocessing import shared_memory
+            shm = shared_memory.SharedMemory(create=True, size=SHM_BYTES)
+        except Exception:
+            return
+        if self.request32('attach_shm', shm.name):
+            self._shm = shm
+        else:
+            shm.close()
+            shm.unlink()
+
+    def _detach_shm(self):
+        if self._shm is not None:
+            self.request32('detach_shm')
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
     def get_version(self) -> Version:
         return Version(self.request32('get_version'))
 
@@ -79,6 +110,18 @@ class GoIOWrapper64(Client64):
         return self.request32('send_command_get_response', handle, command, parameter,
                               response)
 
+    def send_command_checked(
+            self, handle: int, command: Union[SensorCommand, str],
+            parameter: Optional[Union[LEDParam]] = None,
+            response: Optional[Union[DefaultResponse, LEDParam]] = None) -> tuple:
+        """ Send a command and get both its response and the response status
+
+        One RPC instead of the two needed with send_command_get_response followed
+        by get_response_status
+        """
+        return self.request32('send_command_checked', handle, command, parameter,
+                              response)
+
     def get_status(self, handle: int) -> SensorStatus:
         return self.request32('get_status', handle)
 
@@ -104,15 +147,67 @@ class GoIOWrapper64(Client64):
 
     def read_raw(self, handle) -> np.ndarray:
         """ Get all stored measurements from the buffer"""
-        return np.array(self.request32('read_raw', handle))
+        if self._shm is not None:
+            n = self.request32('read_raw_shm', handle)
+            return np.frombuffer(self._shm.buf, dtype=np.int32, count=n).copy()
+        return np.frombuffer(self.request32('read_raw', handle), dtype=np.int32)
+
+    def _decode_read_payload(self, payload) -> np.ndarray:
+        """ Map a server read reply (shared-memory count or packed bytes) to samples"""
+        if self._shm is not None:
+            return np.frombuffer(self._shm.buf, dtype=np.int32, count=payload).copy()
+        return np.frombuffer(payload, dtype=np.int32)
+
+    def read_raw_with_status(self, handle) -> tuple:
+        """ Get (SensorStatus, measurements) in a single round-trip
+
+        Halves the bridge hops of the usual get_status then read_raw polling cycle
+        """
+        status, payload = self.request32('read_raw_with_status', handle)
+        return status, self._decode_read_payload(payload)
+
+    def poll_bundle(self, handle, n_expected: int, timeout: float = 1.) -> tuple:
+        """ Get (SensorStatus, measurements) once n_expected samples are available
+
+        The server waits (bounded by timeout) next to the DLL, so a whole
+        acquisition window costs a single round-trip
+        """
+        status, payload = self.request32('poll_bundle', handle, n_expected, timeout)
+        return status, self._decode_read_payload(payload)
+
+    def stream_raw(self, handle, n_per_chunk: int = 64,
+                   n_chunks: Optional[int] = None, timeout: float = 1.):
+        """ Yield successive chunks of raw measurements as int32 numpy arrays
+
+        Each chunk costs a single round-trip (see poll_bundle) and the device FIFO
+        is drained continuously instead of accumulating during a long sleep, so no
+        samples are lost to the bounded GoIO internal buffer
+        """
+        ind = 0
+        while n_chunks is None or ind < n_chunks:
+            _, data = self.poll_bundle(handle, n_per_chunk, timeout)
+            yield data
+            ind += 1
 
     def read_raw_latest(self, handle) -> int:
         """ Get the last stored measurement from the buffer, then clears it"""
         return self.request32('read_raw_latest', handle)
 
+    def read_latest_batch(self, handle, max_n: int = 64) -> np.ndarray:
+        """ Get up to max_n of the newest stored measurements in one round-trip
+
+        The server drains the whole measurement FIFO and returns its tail, so the
+        result tracks the sensor in real time however fast it samples
+        """
+        if self._shm is not None:
+            n = self.request32('read_latest_batch_shm', handle, max_n)
+            return np.frombuffer(self._shm.buf, dtype=np.int32, count=n).copy()
+        return np.frombuffer(self.request32('read_latest_batch', handle, max_n),
+                             dtype=np.int32)
+
     def raw_to_voltage(self, handle, raw_data: int) -> float:
         """ Convert raw integer data into a voltage data """
-        return self.request32('raw_to_voltage', handle)
+        return self.request32('raw_to_voltage', handle, raw_data)
 
     def volt_to_calibrated(self, handle, volt_data: float) -> float:
         """ Convert a voltage data into a calibrated one
@@ -124,9 +219,33 @@ class GoIOWrapper64(Client64):
     def raw_to_calibrated(self, handle: int, raw_data: int) -> float:
         return self.request32('raw_to_calibrated', handle, raw_data)
 
+    def raw_to_calibrated_array(self, handle: int, raw: np.ndarray) -> np.ndarray:
+        """ Convert a whole buffer of raw samples in a single round-trip
+
+        The per-sample DLL loop runs on the server side; prefer
+        Sensor.raw_to_calibrated when the calibration polynomial is cached, which
+        avoids the round-trip entirely
+        """
+        raw = np.ascontiguousarray(raw, dtype=np.int32)
+        return np.frombuffer(
+            self.request32('raw_to_calibrated_array', handle, raw.tobytes()),
+            dtype=np.float64)
+
     def get_probe_type(self, handle: int):
         return self.request32('get_probe_type', handle)
 
+    def get_sensor_number(self, handle: int, query_hardware: bool = False) -> int:
+        """ Get the DDS record sensor id of the attached probe (0 for legacy ones)"""
+        return self.request32('get_sensor_number', handle, query_hardware)
+
+    def get_calibration(self, handle: int) -> tuple:
+        """ Get the active calibration as (equation, a, b, c, volt_slope, volt_offset)
+
+        The coefficients apply to volts; volt_slope/volt_offset map raw counts to
+        volts and are None for probe types whose mapping is not affine
+        """
+        return self.request32('get_calibration', handle)
+
 
 if __name__ == '__main__':
 
@@ -149,11 +268,9 @@ if __name__ == '__main__':
         print(goio.set_led(sensor.handle, color='RED', brightness='BRIGHTNESS_MIN'))
         print(goio.set_led(sensor.handle, color='GREEN', brightness='BRIGHTNESS_MAX'))
 
-        print(f'Nmeasurements: {goio.get_n_available_measurements(sensor.handle)}')
         goio.start(sensor.handle)
-        time.sleep(2)
-        print(f'Nmeasurements: {goio.get_n_available_measurements(sensor.handle)}')
-        print(goio.read_raw(sensor.handle))
+        for chunk in goio.stream_raw(sensor.handle, n_per_chunk=50, n_chunks=10):
+            print(chunk)
 
         print(goio.read_raw_latest(sensor.handle))
         print(goio.raw_to_calibrated(sensor.handle, goio.read_raw_latest(sensor.handle)))
@@ -1,39 +1,51 @@
-from dataclasses import dataclass
+import functools
 import os
 import sys
 import ctypes
-from ctypes import c_int, c_uint8, byref
+from ctypes import (c_char_p, c_double, c_int, c_int32, c_uint8, c_uint16, c_uint32,
+                    c_void_p, byref, POINTER)
 from pathlib import Path
 import time
-from typing import Union, Optional, List
+from typing import Union, Optional, List, NamedTuple
 from msl.loadlib import Server32
 from enum import Enum
 
 here = Path(__file__).parent
 dll_path = here.joinpath('win32')
 
-os.add_dll_directory(str(dll_path.absolute().resolve()))
+_dll_dir_added = False
+
+
+def _add_dll_directory():
+    """ Register the bundled win32 directory for DLL resolution, at most once
+
+    Deferred to server construction so that merely importing this module (the
+    64-bit client does, for the enums and ctypes structures) has no side effect
+    """
+    global _dll_dir_added
+    if not _dll_dir_added:
+        os.add_dll_directory(str(dll_path.absolute().resolve()))
+        _dll_dir_added = True
 
 
 class BaseEnum(Enum):
     """Enum to be used within pymodaq with some utility methods"""
 
     @classmethod
-    def names(cls) -> List[str]:
-        """Returns all the names of the enum"""
-        return list(cls.__members__.keys())
+    def names(cls):
+        """Returns a view on all the names of the enum"""
+        return cls.__members__.keys()
 
     @classmethod
     def values(cls) -> List[str]:
         """Returns all the names of the enum"""
         return [cls[name].value for name in cls.names()]
 
-    def __eq__(self, other: Union[str, Enum]):
-        """testing for equality using the enum name"""
-        if isinstance(other, str):
-            if other == self.name:
-                return True
-        return super().__eq__(other)
+
+@functools.lru_cache(maxsize=None)
+def _lower_name_index(enum) -> dict:
+    """ Lowercased name to member mapping of an enum class, built once per class"""
+    return {name.lower(): member for name, member in enum.__members__.items()}
 
 
 def enum_checker(enum: BaseEnum, item: Union[BaseEnum, str]):
@@ -55,14 +67,14 @@ def enum_checker(enum: BaseEnum, item: Union[BaseEnum, str]):
     if not isinstance(item, enum):
         if not isinstance(item, str):
             raise ValueError(f'{item} is an invalid {enum}. Should be a {enum} enum or '
-                             f'a string in {enum.names()}')
-        for ind, name in enumerate(enum.names()):
-            if item.lower() == name.lower():
-                item = enum[name]
-                break
-        else:
+                             f'a string in {list(enum.names())}')
+        member = enum.__members__.get(item)
+        if member is None:
+            member = _lower_name_index(enum).get(item.lower())
+        if member is None:
             raise ValueError(f'{item} is an invalid {enum}. Should be a {enum} enum or '
-                             f'a string in {enum.names()}')
+                             f'a string in {list(enum.names())}')
+        return member
     return item
 
 
@@ -78,8 +90,28 @@ class ProductID(BaseEnum):
     LabQuest = 0x0005
 
 
-@dataclass
-class SensorInfo:
+#  precomputed raw values, same rationale as _CMD_INT below: the conversion on the
+#  frequently travelled paths is a dict hit instead of the enum_checker machinery
+_VENDOR_INT = VendorID.Vernier.value
+_PRODUCT_INT = {name: member.value for name, member in ProductID.__members__.items()}
+
+
+def _enum_int(table: dict, enum, item) -> int:
+    """ Fast string/enum to raw value conversion through a precomputed table
+
+    Falls back to enum_checker for case-insensitive string names
+    """
+    if isinstance(item, str):
+        val = table.get(item)
+        if val is None:
+            val = enum_checker(enum, item).value
+        return val
+    return item.value
+
+
+class SensorInfo(NamedTuple):
+    #  crosses the 32/64 pickle bridge on every open/info query, so a NamedTuple
+    #  keeps the wire format a plain tuple instead of a dict-carrying dataclass
     handle: int
     name: str
     vendor: VendorID
@@ -102,6 +134,34 @@ class SensorCommand(BaseEnum):
     GET_ANALOG_INPUT_CHANNEL = 0x2A
 
 
+#  raw command bytes keyed by name, so the hot command path can skip the
+#  enum_checker machinery and branch on plain ints
+_CMD_INT = {name: member.value for name, member in SensorCommand.__members__.items()}
+#  ready-made c_uint8 per command, saving one ctypes construction per send
+_CMD_CHAR = {member.value: c_uint8(member.value) for member in SensorCommand}
+
+#  hoisted lookups for the commands issued by the convenience methods below
+_GET_STATUS = SensorCommand.GET_STATUS
+_START_MEASUREMENTS = SensorCommand.START_MEASUREMENTS
+_STOP_MEASUREMENTS = SensorCommand.STOP_MEASUREMENTS
+_GET_LED_STATE = SensorCommand.GET_LED_STATE
+_SET_LED_STATE = SensorCommand.SET_LED_STATE
+
+#  scratch buffer for device-name queries; safe to share at module scope because it
+#  is only live during a single synchronous DLL call and decoded right after
+_DEVNAME_BUF = ctypes.create_string_buffer(256)
+
+_STRUCT_SIZE = {}
+
+
+def _struct_size(ctype) -> int:
+    """ ctypes.sizeof of a parameter/response type, memoized per type"""
+    size = _STRUCT_SIZE.get(ctype)
+    if size is None:
+        size = _STRUCT_SIZE[ctype] = ctypes.sizeof(ctype)
+    return size
+
+
 class SensorStatus(BaseEnum):
     SUCCESS = 0
     NOT_READY_FOR_NEW_CMD = 0x30
@@ -120,8 +180,13 @@ class SensorStatus(BaseEnum):
     ERROR_COMMUNICATION = 0xF0
 
 
-@dataclass
-class SensorErrorStatus:
+#  Enum's own value-to-member mapping, used directly so response decoding is a
+#  dict hit instead of going through Enum.__call__
+_CMD_MAP = SensorCommand._value2member_map_
+_STATUS_MAP = SensorStatus._value2member_map_
+
+
+class SensorErrorStatus(NamedTuple):
     last_command: SensorCommand
     last_status: SensorStatus
     last_command_with_error: SensorCommand
@@ -145,6 +210,11 @@ class LEDBrightness(BaseEnum):
     OrangeLedBrightness = 4
 
 
+_LED_COLOR_INT = {name: member.value for name, member in LEDColor.__members__.items()}
+_LED_BRIGHT_INT = {name: member.value
+                   for name, member in LEDBrightness.__members__.items()}
+
+
 class ProbeType(BaseEnum):
     kProbeTypeNoProbe = 0
     kProbeTypeAnalog5V = 2
@@ -160,6 +230,30 @@ class ProbeType(BaseEnum):
     kNumProbeTypes = 14
 
 
+class CalibrationEquation(BaseEnum):
+    #  EEquationType in GSensorDDSMem.h: how CalibrateData maps volts to units
+    kEquationType_None = 0
+    kEquationType_Linear = 1        # y = b * x + a
+    kEquationType_Quadratic = 2     # y = c * x**2 + b * x + a
+    kEquationType_Power = 3
+    kEquationType_ModifiedPower = 4
+    kEquationType_Logarithmic = 5
+    kEquationType_ModifiedLogarithmic = 6
+    kEquationType_Exponential = 7
+    kEquationType_ModifiedExponential = 8
+    kEquationType_Geometric = 9
+    kEquationType_ModifiedGeometric = 10
+    kEquationType_ReciprocalLog = 11
+    kEquationType_SteinhartHart = 12
+    kEquationType_Motion = 13
+    kEquationType_Rotary = 14
+    kEquationType_HeatPulser = 15
+    kEquationType_DropCounter = 16
+
+
+_EQUATION_MAP = CalibrationEquation._value2member_map_
+
+
 class DefaultResponse(ctypes.Structure):
     _fields_ = [('status', c_uint8)]
 
@@ -175,9 +269,197 @@ class LEDParam(ctypes.Structure):
 
 class GoIOWrapper32(Server32):
 
+    #  seconds before a cached device count is considered stale
+    _COUNT_TTL = 1.
+
     def __init__(self, host, port, **kwargs):
+        _add_dll_directory()
         super().__init__(
             str(dll_path.absolute().resolve().joinpath('GoIO_DLL.dll')), 'cdll', host, port)
+        self._shm = None
+        self._declare_signatures()
+        #  bound once so the bulk-read paths skip the per-call attribute lookup on
+        #  the CDLL object
+        self._read_raw_meas = self.lib.GoIO_Sensor_ReadRawMeasurements
+        self._send_cmd = self.lib.GoIO_Sensor_SendCmdAndGetResponse
+        self._to_voltage = self.lib.GoIO_Sensor_ConvertToVoltage
+        self._calibrate = self.lib.GoIO_Sensor_CalibrateData
+        self._n_available = self.lib.GoIO_Sensor_GetNumMeasurementsAvailable
+        self._latest_raw = self.lib.GoIO_Sensor_GetLatestRawMeasurement
+        self._probe_type = self.lib.GoIO_Sensor_GetProbeType
+        #  reused across polls: GoIO buffers at most a few thousand samples, so a
+        #  fixed scratch array avoids an allocation per read; its length is a
+        #  multiple of 6 because GoIO_Sensor_ReadRawMeasurements may lose samples
+        #  above 50 meas/s when maxCount is neither that nor the available count
+        self._raw_buf = (c_int32 * 4098)()
+        #  reusable response structs and length cell: the server handles one request
+        #  at a time, so the polling commands need not allocate ctypes objects
+        self._default_resp = DefaultResponse()
+        self._led_resp = LEDParam()
+        self._resp_len = c_int(0)
+        self._resp_len_ref = byref(self._resp_len)
+        #  same idea for the open/info queries: one name buffer and two int cells
+        #  reused across calls, decoded before the next use
+        self._name_buf = ctypes.create_string_buffer(256)
+        self._vendor_c = c_int()
+        self._product_c = c_int()
+        #  device counts per product, kept briefly so indexed name queries do not
+        #  re-enumerate the USB bus for every index
+        self._product_counts = {}
+        self._specialize_simple_commands()
+
+    def _specialize_simple_commands(self):
+        """ Build specialized senders for the parameterless commands at init time
+
+        start/stop carry no parameter and no response, so their whole send path
+        collapses into one cached ctypes call with the precomputed command byte,
+        skipping the generic branching of send_command_get_response
+        """
+        send = self._send_cmd
+
+        def make_sender(command: SensorCommand):
+            cmd_char = _CMD_CHAR[command.value]
+
+            def sender(handle):
+                res = send(handle, cmd_char, None, 0, None, None, 1000)
+                if res != 0:
+                    raise GoIOError(f'Command {command.name} '
+                                    f'returned with error {res}')
+            return sender
+
+        self._start_sender = make_sender(_START_MEASUREMENTS)
+        self._stop_sender = make_sender(_STOP_MEASUREMENTS)
+
+    def _declare_signatures(self):
+        """ Declare argtypes/restype for every GoIO entrypoint in use
+
+        Explicit signatures let ctypes use its typed fast path instead of running
+        the generic libffi inference on every argument of every call
+        """
+        lib = self.lib
+        lib.GoIO_Init.argtypes = []
+        lib.GoIO_Init.restype = c_int32
+        lib.GoIO_Uninit.argtypes = []
+        lib.GoIO_Uninit.restype = c_int32
+        lib.GoIO_GetDLLVersion.argtypes = [POINTER(c_uint16), POINTER(c_uint16)]
+        lib.GoIO_GetDLLVersion.restype = c_int32
+        lib.GoIO_UpdateListOfAvailableDevices.argtypes = [c_int32, c_int32]
+        lib.GoIO_UpdateListOfAvailableDevices.restype = c_int32
+        lib.GoIO_GetNthAvailableDeviceName.argtypes = [c_char_p, c_int32, c_int32,
+                                                       c_int32, c_int32]
+        lib.GoIO_GetNthAvailableDeviceName.restype = c_int32
+        lib.GoIO_Sensor_Open.argtypes = [c_char_p, c_int32, c_int32, c_int32]
+        lib.GoIO_Sensor_Open.restype = c_void_p
+        lib.GoIO_Sensor_Close.argtypes = [c_void_p]
+        lib.GoIO_Sensor_Close.restype = c_int32
+        lib.GoIO_Sensor_ClearIO.argtypes = [c_void_p]
+        lib.GoIO_Sensor_ClearIO.restype = c_int32
+        lib.GoIO_Sensor_GetOpenDeviceName.argtypes = [c_void_p, c_char_p, c_int32,
+                                                      POINTER(c_int32), POINTER(c_int32)]
+        lib.GoIO_Sensor_GetOpenDeviceName.restype = c_int32
+        lib.GoIO_Sensor_SendCmdAndGetResponse.argtypes = [c_void_p, c_uint8, c_void_p,
+                                                          c_int32, c_void_p,
+                                                          POINTER(c_int32), c_int32]
+        lib.GoIO_Sensor_SendCmdAndGetResponse.restype = c_int32
+        lib.GoIO_Sensor_GetLastCmdResponseStatus.argtypes = [
+            c_void_p, POINTER(c_uint8), POINTER(c_uint8), POINTER(c_uint8),
+            POINTER(c_uint8)]
+        lib.GoIO_Sensor_GetLastCmdResponseStatus.restype = c_int32
+        lib.GoIO_Sensor_GetNumMeasurementsAvailable.argtypes = [c_void_p]
+        lib.GoIO_Sensor_GetNumMeasurementsAvailable.restype = c_int32
+        lib.GoIO_Sensor_ReadRawMeasurements.argtypes = [c_void_p, POINTER(c_int32),
+                                                        c_uint32]
+        lib.GoIO_Sensor_ReadRawMeasurements.restype = c_int32
+        lib.GoIO_Sensor_GetLatestRawMeasurement.argtypes = [c_void_p]
+        lib.GoIO_Sensor_GetLatestRawMeasurement.restype = c_int32
+        lib.GoIO_Sensor_ConvertToVoltage.argtypes = [c_void_p, c_int32]
+        lib.GoIO_Sensor_ConvertToVoltage.restype = c_double
+        lib.GoIO_Sensor_CalibrateData.argtypes = [c_void_p, c_double]
+        lib.GoIO_Sensor_CalibrateData.restype = c_double
+        lib.GoIO_Sensor_GetProbeType.argtypes = [c_void_p]
+        lib.GoIO_Sensor_GetProbeType.restype = c_int32
+        lib.GoIO_Sensor_DDSMem_GetActiveCalPage.argtypes = [c_void_p, POINTER(c_uint8)]
+        lib.GoIO_Sensor_DDSMem_GetActiveCalPage.restype = c_int32
+        lib.GoIO_Sensor_DDSMem_GetCalPage.argtypes = [
+            c_void_p, c_uint8, POINTER(ctypes.c_float), POINTER(ctypes.c_float),
+            POINTER(ctypes.c_float), c_char_p, c_uint16]
+        lib.GoIO_Sensor_DDSMem_GetCalPage.restype = c_int32
+        lib.GoIO_Sensor_DDSMem_GetCalibrationEquation.argtypes = [
+            c_void_p, POINTER(ctypes.c_int8)]
+        lib.GoIO_Sensor_DDSMem_GetCalibrationEquation.restype = c_int32
+        lib.GoIO_Sensor_DDSMem_GetSensorNumber.argtypes = [c_void_p, POINTER(c_uint8),
+                                                           c_int32, c_int32]
+        lib.GoIO_Sensor_DDSMem_GetSensorNumber.restype = c_int32
+
+    def attach_shm(self, name: str) -> bool:
+        """ Attach the shared-memory block created by the 64-bit client
+
+        Bulk measurement reads are then written straight into it instead of being
+        pickled over the RPC channel. Returns False if shared memory is not
+        available in this interpreter, in which case the client keeps the RPC path
+        """
+        try:
+            from multiprocessing import shared_memory
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._shm_capacity = self._shm.size // ctypes.sizeof(c_int32)
+            self._shm_arr = (c_int32 * self._shm_capacity).from_buffer(self._shm.buf)
+            return True
+        except Exception:
+            self._shm = None
+            return False
+
+    def detach_shm(self):
+        if self._shm is not None:
+            self._shm_arr = None  # release the exported buffer before closing
+            self._shm.close()
+            self._shm = None
+
+    def read_raw_shm(self, handle) -> int:
+        """ Read all stored measurements directly into the shared-memory block
+
+        Returns only the number of samples written; the client maps them as an
+        int32 numpy view without any pickling
+        """
+        n = self._read_raw_meas(handle, self._shm_arr, self._shm_capacity)
+        return max(n, 0)
+
+    def read_raw_with_status(self, handle) -> tuple:
+        """ Get the sensor status and drain the measurement buffer in one request
+
+        Fuses the GET_STATUS command with the read so a status+read polling cycle
+        costs a single bridge hop; the payload is the shared-memory sample count
+        when attached, the packed bytes otherwise
+        """
+        status = self.get_status(handle)
+        if self._shm is not None:
+            return status, self.read_raw_shm(handle)
+        return status, self.read_raw(handle)
+
+    def poll_bundle(self, handle, n_expected: int, timeout: float = 1.) -> tuple:
+        """ Wait until n_expected samples are buffered, then return them with the
+        sensor status in a single reply
+
+        The bounded wait runs here next to the DLL, so the 64-bit client issues
+        one request per acquisition window instead of polling per sample
+        """
+        n_expected = min(n_expected, len(self._raw_buf))
+        t0 = time.perf_counter()
+        while (self._n_available(handle) < n_expected
+               and time.perf_counter() - t0 < timeout):
+            time.sleep(0.001)
+        return self.read_raw_with_status(handle)
+
+    def read_latest_batch_shm(self, handle, max_n: int) -> int:
+        """ As read_latest_batch but writing into the shared-memory block
+
+        Returns only the number of samples written, so the reply carries a single
+        int instead of the pickled payload
+        """
+        size = ctypes.sizeof(c_int32)
+        start, count = self._drain_latest(handle, min(max_n, self._shm_capacity))
+        ctypes.memmove(self._shm_arr,
+                       ctypes.addressof(self._raw_buf) + start * size, count * size)
+        return count
 
     def __enter__(self):
         self.open_library()
@@ -197,13 +479,12 @@ class GoIOWrapper32(Server32):
             raise GoIOError('Library closing failed')
 
     def get_version(self) -> str:
-        major = ctypes.c_uint16(0)
+        major = ctypes.c_uint16()
         minor = ctypes.c_uint16()
-        patch = ctypes.c_uint16()
-        res = self.lib.GoIO_GetDLLVersion(byref(minor), byref(patch))
+        res = self.lib.GoIO_GetDLLVersion(byref(major), byref(minor))
         if res != 0:
             raise GoIOError('Incorrect version query')
-        return f'{major.value}.{minor.value}.{patch.value}'
+        return f'{major.value}.{minor.value}'
 
     def get_connected_products(self, product: Union[ProductID, str]) -> int:
         """ Get the number of connected product by name
@@ -216,33 +497,54 @@ class GoIOWrapper32(Server32):
         -------
         int: he number of connected device of this type
         """
-        product = enum_checker(ProductID, product)
-        return self.lib.GoIO_UpdateListOfAvailableDevices(VendorID.Vernier.value, product.value)
+        product_val = _enum_int(_PRODUCT_INT, ProductID, product)
+        return self._refresh_device_list(product_val)
+
+    def _refresh_device_list(self, product_val: int) -> int:
+        """ Re-enumerate the USB bus for this product and cache the device count"""
+        count = self.lib.GoIO_UpdateListOfAvailableDevices(_VENDOR_INT, product_val)
+        self._product_counts[product_val] = (count, time.perf_counter())
+        return count
+
+    def _cached_count(self, product_val: int) -> int:
+        """ Device count from the cache if fresh enough, re-enumerating otherwise"""
+        cached = self._product_counts.get(product_val)
+        if cached is not None and time.perf_counter() - cached[1] < self._COUNT_TTL:
+            return cached[0]
+        return self._refresh_device_list(product_val)
 
     def get_device_by_index(self, product: Union[ProductID, str], index: int = 0) -> str:
-        product = enum_checker(ProductID, product)
-        n_products = self.get_connected_products(product)
-        device = ctypes.create_string_buffer(256)
-        if index < n_products:
-
-            self.lib.GoIO_GetNthAvailableDeviceName(byref(device), 256,
-                                                     VendorID.Vernier.value, product.value, index)
-        return device.value.decode()
+        product_val = _enum_int(_PRODUCT_INT, ProductID, product)
+        n_products = self._cached_count(product_val)
+        if index >= n_products:
+            return ''
+        self.lib.GoIO_GetNthAvailableDeviceName(_DEVNAME_BUF, 256,
+                                                _VENDOR_INT, product_val, index)
+        return _DEVNAME_BUF.value.decode()
 
     def get_devices(self, product: Union[str, ProductID]) -> List[str]:
-        n_devices = self.get_connected_products(product)
+        """ Get the names of all connected devices of this type in one enumeration
+
+        The list is built server side and returned in a single reply, with the USB
+        bus enumerated only once instead of once per device
+        """
+        product_val = _enum_int(_PRODUCT_INT, ProductID, product)
+        n_devices = self._refresh_device_list(product_val)
         devices = []
         for ind in range(n_devices):
-            devices.append(self.get_device_by_index(product, ind))
+            self.lib.GoIO_GetNthAvailableDeviceName(_DEVNAME_BUF, 256,
+                                                    _VENDOR_INT, product_val, ind)
+            devices.append(_DEVNAME_BUF.value.decode())
         return devices
 
     def open_sensor(self, device_id: str, product: Union[ProductID, str]) -> SensorInfo:
         product = enum_checker(ProductID, product)
-        device = ctypes.create_string_buffer(device_id.encode())
+        self._name_buf.value = device_id.encode()
 
-        handle = self.lib.GoIO_Sensor_Open(byref(device), VendorID.Vernier.value,
+        handle = self.lib.GoIO_Sensor_Open(self._name_buf, VendorID.Vernier.value,
                                             product.value, 1)
-        return SensorInfo(handle, device.value.decode(), VendorID.Vernier, product)
+        return SensorInfo(handle, self._name_buf.value.decode(), VendorID.Vernier,
+                          product)
 
     def close_sensor(self, handle: int) -> int:
         res = self.lib.GoIO_Sensor_Close(handle)
@@ -253,18 +555,16 @@ class GoIOWrapper32(Server32):
         return res
 
     def get_sensor_info(self, handle) -> SensorInfo:
-        vendor = c_int()
-        product = c_int()
-        device = ctypes.create_string_buffer(256)
-
-        res = self.lib.GoIO_Sensor_GetOpenDeviceName(handle, byref(device), 256,
-                                                      byref(vendor), byref(product))
+        res = self.lib.GoIO_Sensor_GetOpenDeviceName(handle, self._name_buf, 256,
+                                                      byref(self._vendor_c),
+                                                      byref(self._product_c))
 
         if res != 0:
             raise GoIOError(f'Get Sensor Info returned with error {res}')
 
-        return SensorInfo(handle, device.value.decode(), VendorID(vendor.value),
-                          ProductID(product.value))
+        return SensorInfo(handle, self._name_buf.value.decode(),
+                          VendorID(self._vendor_c.value),
+                          ProductID(self._product_c.value))
 
     def send_command_get_response(
             self, handle: int, command: Union[SensorCommand, str],
@@ -272,29 +572,58 @@ class GoIOWrapper32(Server32):
             response: Optional[Union[DefaultResponse, LEDParam]] = None) -> \
             Union[DefaultResponse, LEDParam]:
 
-        command = enum_checker(SensorCommand, command)
-        command_char = c_uint8(command.value)
-
-        parameter_len = 0 if parameter is None else ctypes.sizeof(parameter)
-        response_len = 0 if response is None else ctypes.sizeof(response)
+        if isinstance(command, str):
+            cmd_int = _CMD_INT.get(command.upper())
+            if cmd_int is None:
+                #  not an exact name: let enum_checker resolve it or raise the
+                #  usual descriptive ValueError
+                cmd_int = enum_checker(SensorCommand, command).value
+        elif isinstance(command, SensorCommand):
+            cmd_int = command.value
+        else:
+            cmd_int = int(command)
+        command_char = _CMD_CHAR.get(cmd_int)
+        if command_char is None:
+            command_char = c_uint8(cmd_int)
+
+        parameter_len = 0 if parameter is None else _struct_size(type(parameter))
+        if response is not None:
+            self._resp_len.value = _struct_size(type(response))
+            resp_len_ref = self._resp_len_ref
+        else:
+            resp_len_ref = None
 
-        res = self.lib.GoIO_Sensor_SendCmdAndGetResponse(
+        res = self._send_cmd(
             handle, command_char,
             byref(parameter) if parameter is not None else None,
             parameter_len,
             byref(response) if response is not None else None,
-            byref(c_int(response_len)) if response is not None else None, 1000)
+            resp_len_ref, 1000)
 
         if res != 0:
-            raise GoIOError(f'Command {command.name} returned with error {res}')
+            command = _CMD_MAP.get(cmd_int, cmd_int)
+            raise GoIOError(f'Command {getattr(command, "name", command)} '
+                            f'returned with error {res}')
 
         return response
 
+    def send_command_checked(
+            self, handle: int, command: Union[SensorCommand, str],
+            parameter: Optional[Union[LEDParam]] = None,
+            response: Optional[Union[DefaultResponse, LEDParam]] = None) -> tuple:
+        """ Send a command and read the response status in a single round-trip
+
+        Fuses send_command_get_response and get_response_status so that the common
+        'send then check' pattern costs one bridge hop instead of two
+        """
+        response = self.send_command_get_response(handle, command, parameter, response)
+        return response, self.get_response_status(handle)
+
     def get_status(self, handle: int) -> SensorStatus:
-        command = SensorCommand['GET_STATUS']
-        response = DefaultResponse()
-        self.send_command_get_response(handle, command, response=response)
-        return SensorStatus(response.status)
+        response = self._default_resp
+        response.status = 0
+        self.send_command_get_response(handle, _GET_STATUS, response=response)
+        return _STATUS_MAP[response.status]
 
     def get_response_status(self, handle: int, ) -> SensorErrorStatus:
 
@@ -312,69 +641,178 @@ class GoIOWrapper32(Server32):
         if res != 0:
             raise GoIOError(f'Status could not be fetched')
 
-        return SensorErrorStatus(SensorCommand(last_command.value),
-                                 SensorStatus(last_status.value),
-                                 SensorCommand(last_command_with_error.value),
-                                 SensorStatus(last_error.value))
+        return SensorErrorStatus(_CMD_MAP[last_command.value],
+                                 _STATUS_MAP[last_status.value],
+                                 _CMD_MAP[last_command_with_error.value],
+                                 _STATUS_MAP[last_error.value])
 
     def get_led_status(self, handle):
-        command = SensorCommand['GET_LED_STATE']
-        response = LEDParam()
-
-        self.send_command_get_response(handle, command, None, response)
+        response = self._led_resp
+        self.send_command_get_response(handle, _GET_LED_STATE, None, response)
         return response
 
     def set_led(self, handle: int, color: Union[str, LEDColor] = LEDColor.GREEN,
                 brightness: Union[str, LEDBrightness] = LEDBrightness.BRIGHTNESS_MAX):
 
-        command = SensorCommand['SET_LED_STATE']
-        color = enum_checker(LEDColor, color)
-        brightness = enum_checker(LEDBrightness, brightness)
-        led_param = LEDParam(color.value, brightness.value)
-        led_response = LEDParam()
+        led_param = LEDParam(_enum_int(_LED_COLOR_INT, LEDColor, color),
+                             _enum_int(_LED_BRIGHT_INT, LEDBrightness, brightness))
+        led_response = self._led_resp
 
-        self.send_command_get_response(handle, command, led_param, led_response)
+        self.send_command_get_response(handle, _SET_LED_STATE, led_param, led_response)
         return led_response
 
     def start(self, handle):
-        command = SensorCommand['START_MEASUREMENTS']
-        self.send_command_get_response(handle, command)
+        self._start_sender(handle)
 
     def stop(self, handle):
-        command = SensorCommand['STOP_MEASUREMENTS']
-        self.send_command_get_response(handle, command)
+        self._stop_sender(handle)
 
     def get_n_available_measurements(self, handle):
         """ Get the available number of measurements in the buffer"""
-        return self.lib.GoIO_Sensor_GetNumMeasurementsAvailable(handle)
+        return self._n_available(handle)
 
-    def read_raw(self, handle) -> list:
-        """ Get all stored measurements from the buffer"""
-        max_count = self.get_n_available_measurements(handle)
-        data = (c_int * max_count)()
-        self.lib.GoIO_Sensor_ReadRawMeasurements(handle, byref(data), max_count)
-        return list(data)
+    def read_raw(self, handle) -> bytes:
+        """ Get all stored measurements from the buffer as packed int32 bytes
+
+        A single DLL call: GoIO_Sensor_ReadRawMeasurements returns the number of
+        samples it drained, so no separate availability query is needed, and the
+        raw bytes go over the wire without boxing each sample into a Python int
+        """
+        n = self._read_raw_meas(handle, self._raw_buf, len(self._raw_buf))
+        if n < 0:
+            n = 0
+        return ctypes.string_at(self._raw_buf, n * ctypes.sizeof(c_int32))
 
     def read_raw_latest(self, handle) -> int:
         """ Get the last stored measurement from the buffer, then clears it"""
-        return self.lib.GoIO_Sensor_GetLatestRawMeasurement(handle)
+        return self._latest_raw(handle)
+
+    def _drain_latest(self, handle, max_n: int) -> tuple:
+        """ Drain the measurement FIFO, locating the newest max_n samples
+
+        GoIO_Sensor_ReadRawMeasurements pops the oldest samples first, so the
+        whole FIFO is emptied into the scratch buffer (in several passes if it
+        held more than one buffer's worth) and (start, count) of the tail of the
+        last pass is returned. This keeps readers current with the sensor instead
+        of lagging ever further behind when it samples faster than they poll
+        """
+        buf = self._raw_buf
+        capacity = len(buf)
+        n = self._read_raw_meas(handle, buf, capacity)
+        while n == capacity:
+            latest = self._read_raw_meas(handle, buf, capacity)
+            if latest <= 0:
+                break
+            n = latest
+        if n < 0:
+            n = 0
+        start = max(n - max_n, 0)
+        return start, n - start
+
+    def read_latest_batch(self, handle, max_n: int = 64) -> bytes:
+        """ Get up to max_n of the most recent stored measurements in a single call
+
+        The FIFO is drained completely and only the newest samples are returned,
+        as packed little-endian int32 bytes so the 64-bit client can wrap them
+        with numpy without per-element boxing
+        """
+        size = ctypes.sizeof(c_int32)
+        start, count = self._drain_latest(handle, max_n)
+        return ctypes.string_at(ctypes.addressof(self._raw_buf) + start * size,
+                                count * size)
 
     def raw_to_voltage(self, handle, raw_data: int) -> float:
         """ Convert raw integer data into a voltage data """
-        return self.lib.GoIO_Sensor_ConvertToVoltage(handle, raw_data)
+        return self._to_voltage(handle, raw_data)
 
     def volt_to_calibrated(self, handle, volt_data: float) -> float:
         """ Convert a voltage data into a calibrated one
 
         Units depend on the connected sensor
         """
-        return self.lib.GoIO_Sensor_CalibrateData(handle, ctypes.c_float(volt_data))
+        return self._calibrate(handle, volt_data)
 
     def raw_to_calibrated(self, handle: int, raw_data: int) -> float:
         return self.volt_to_calibrated(handle, self.raw_to_voltage(handle, raw_data))
 
+    def raw_to_calibrated_array(self, handle: int, raw_bytes: bytes) -> bytes:
+        """ Convert a packed int32 buffer of raw samples to calibrated float64 bytes
+
+        The conversion loop runs here next to the DLL, so a whole buffer costs the
+        caller a single round-trip instead of two per sample
+        """
+        n = len(raw_bytes) // ctypes.sizeof(c_int32)
+        raw = (c_int32 * n).from_buffer_copy(raw_bytes)
+        out = (c_double * n)()
+        to_voltage = self._to_voltage
+        calibrate = self._calibrate
+        for ind in range(n):
+            out[ind] = calibrate(handle, to_voltage(handle, raw[ind]))
+        return ctypes.string_at(out, n * ctypes.sizeof(c_double))
+
     def get_probe_type(self, handle: int):
-        return ProbeType(self.lib.GoIO_Sensor_GetProbeType(handle))
+        return ProbeType(self._probe_type(handle))
+
+    def get_sensor_number(self, handle: int, query_hardware: bool = False) -> int:
+        """ Get the DDS record sensor id of the attached probe
+
+        GoIO_Sensor_Open fills it in, so query_hardware is normally not needed; a
+        changed id on the same Go!Link means the user swapped the attached probe.
+        Legacy probes report 0
+        """
+        number = c_uint8()
+        res = self.lib.GoIO_Sensor_DDSMem_GetSensorNumber(
+            handle, byref(number), 1 if query_hardware else 0, 1000)
+        if res != 0:
+            raise GoIOError(f'Sensor number query returned with error {res}')
+        return number.value
+
+    def _voltage_mapping(self, handle) -> tuple:
+        """ Sample the DLL raw-to-voltage conversion as an affine (slope, offset) pair
+
+        Analog probes map raw counts linearly onto volts; a third sample guards
+        against probe types where this does not hold (e.g. Go!Motion distances),
+        returning (None, None) so callers keep converting through the DLL
+        """
+        v0 = self._to_voltage(handle, 0)
+        v1 = self._to_voltage(handle, 1024)
+        v2 = self._to_voltage(handle, -1024)
+        slope = (v1 - v0) / 1024.
+        if abs(v0 - slope * 1024. - v2) > 1e-9 * max(1., abs(v2)):
+            return None, None
+        return slope, v0
+
+    def get_calibration(self, handle: int) -> tuple:
+        """ Get the active calibration as (equation, a, b, c, volt_slope, volt_offset)
+
+        The (a, b, c) coefficients apply to volts (see GoIO_Sensor_CalibrateData),
+        so the DLL raw-to-voltage mapping is sampled here and returned as an affine
+        (slope, offset) pair; both are None when that mapping is not affine.
+        Fetching all of this once lets the 64-bit side convert whole measurement
+        batches locally instead of one RPC per sample
+        """
+        page = c_uint8()
+        res = self.lib.GoIO_Sensor_DDSMem_GetActiveCalPage(handle, byref(page))
+        if res != 0:
+            raise GoIOError(f'Active calibration page query returned with error {res}')
+        coeff_a = ctypes.c_float()
+        coeff_b = ctypes.c_float()
+        coeff_c = ctypes.c_float()
+        units = ctypes.create_string_buffer(32)
+        res = self.lib.GoIO_Sensor_DDSMem_GetCalPage(handle, page, byref(coeff_a),
+                                                     byref(coeff_b), byref(coeff_c),
+                                                     units, 32)
+        if res != 0:
+            raise GoIOError(f'Calibration page query returned with error {res}')
+        equation_c = ctypes.c_int8()
+        res = self.lib.GoIO_Sensor_DDSMem_GetCalibrationEquation(handle,
+                                                                 byref(equation_c))
+        if res != 0:
+            raise GoIOError(f'Calibration equation query returned with error {res}')
+        equation = _EQUATION_MAP.get(equation_c.value,
+                                     CalibrationEquation.kEquationType_None)
+        slope, offset = self._voltage_mapping(handle)
+        return equation, coeff_a.value, coeff_b.value, coeff_c.value, slope, offset
 
 
 if __name__ == '__main__':